@@ -4,25 +4,28 @@ Replaces the Cloudflare Worker cron.  Runs in an infinite loop, fetching
 data every 30 minutes, writing frontend/data.json, and committing + pushing
 via git.
 
-Dependencies: aiohttp (pip install aiohttp)
+Dependencies: aiohttp>=3.12, orjson (pip install 'aiohttp>=3.12' orjson)
+              Optional: Brotli, which makes aiohttp accept br-compressed bodies
+Shared code:  worker/src/aegis_constants.py and aegis_signals.py (shared with
+              the Cloudflare Worker)
 Environment:  OPENWEATHER_API_KEY must be set.
 """
 
 import asyncio
-import hashlib
-import json
+import fcntl
 import logging
 import os
-import re
 import signal
 import subprocess
 import sys
+import time
 import traceback
-import xml.etree.ElementTree as ET
+from collections import deque
 from datetime import datetime, timedelta
 from pathlib import Path
 
 import aiohttp
+import orjson
 
 # ---------------------------------------------------------------------------
 # Logging
@@ -35,57 +38,64 @@ logging.basicConfig(
 log = logging.getLogger("aegis")
 
 # ---------------------------------------------------------------------------
-# Constants (inlined from worker/src/constants.py)
+# Constants and signal logic (shared with the Worker via worker/src/)
 # ---------------------------------------------------------------------------
+# Appended, not prepended: worker/src also holds the Worker's entry, fetchers
+# and risk modules, which must not shadow the stdlib or installed packages
+sys.path.append(str(Path(__file__).resolve().parent / "worker" / "src"))
+
+from aegis_constants import (  # noqa: E402
+    ALERT_RE,
+    CLOUDFLARE_RADAR_BASE_URL,
+    CLOUDFLARE_RADAR_LOCATION,
+    IRAN_BYTES_RE,
+    IRAN_RE,
+    LOG_SECTION,
+    MAX_MARKET_ODDS,
+    NEGATIVE_RE,
+    OPENSKY_STATES_URL,
+    RSS_FEEDS,
+    SIGNAL_HISTORY_LENGTH,
+    SIGNALS,
+    STRIKE_RE,
+)
+from aegis_signals import (  # noqa: E402
+    FEED_ITEM_TAGS,
+    aviation_from_states,
+    dedup_articles,
+    fetch_pentagon_data,
+    is_near_term_market,
+    iter_feed_items,
+    market_odds,
+    tankers_from_states,
+)
+
 DATA_JSON_PATH = Path("frontend/data.json")
 
-PIZZA_PLACES = [
-    {"name": "Domino's Pizza", "place_id": "ChIJN1t_tDeuEmsRUsoyG83frY4", "address": "Pentagon City"},
-    {"name": "Papa John's", "place_id": "ChIJP3Sa8ziYEmsRUKgyFmh9AQM", "address": "Near Pentagon"},
-    {"name": "Pizza Hut", "place_id": "ChIJrTLr-GyuEmsRBfy61i59si0", "address": "Pentagon Area"},
-]
-
-ALERT_KEYWORDS = ["strike", "attack", "military", "bomb", "missile", "war", "imminent", "troops", "forces"]
-IRAN_KEYWORDS = ["iran", "tehran", "persian gulf", "strait of hormuz"]
-STRIKE_KEYWORDS = ["strike", "attack", "bomb", "military action"]
-NEGATIVE_KEYWORDS = [" not ", "won't", "will not", "doesn't", "does not"]
-
-TANKER_PREFIXES = [
-    # Original fuel/gas station themed
-    "IRON", "SHELL", "TEXAN", "ETHYL", "PEARL", "ARCO",
-    "ESSO", "MOBIL", "GULF", "TOPAZ", "PACK", "DOOM", "TREK", "REACH",
-    # Additional fuel-themed callsigns
-    "EXXON", "TEXACO", "OILER", "OPEC", "PETRO",
-    # KC-10 unit callsigns
-    "TOGA", "DUCE", "FORCE", "GUCCI", "XTNDR", "SPUR", "TEAM", "QUID",
-    # KC-135 unit callsigns
-    "BOLT", "BROKE", "BROOM", "BOBBY", "BOBBIE", "BODE", "CONIC",
-    "MAINE", "BRIG", "ARTLY", "BANKER", "BRUSH",
-    # KC-46 unit callsigns
-    "ARRIS",
-    # Coronet/trans-Atlantic mission callsigns
-    "GOLD", "BLUE", "CLEAN", "VINYL",
-]
-
-USAF_HEX_START = int("AE0000", 16)
-USAF_HEX_END = int("AE7FFF", 16)
-
-RSS_FEEDS = [
-    "https://feeds.bbci.co.uk/news/world/middle_east/rss.xml",
-    "https://www.aljazeera.com/xml/rss/all.xml",
-]
-
-MONTHS = [
-    "january", "february", "march", "april", "may", "june",
-    "july", "august", "september", "october", "november", "december",
-]
-
-# Cloudflare Radar API configuration
-CLOUDFLARE_RADAR_BASE_URL = "https://api.cloudflare.com/client/v4/radar"
-CLOUDFLARE_RADAR_LOCATION = "IR"  # Iran
+# Untracked, next to data.json, so git pull never replaces it under the lock
+INSTANCE_LOCK_PATH = DATA_JSON_PATH.with_name(".update_data.lock")
 
 CYCLE_INTERVAL = 30 * 60  # 30 minutes in seconds
 
+# Sent on every request through the shared session
+HTTP_HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; StrikeRadar/1.0)"}
+
+# One keep-alive pool for the life of the process: every cycle reuses the
+# same connector (DNS cache, TLS context, idle sockets) instead of rebuilding it.
+# aiohttp speaks HTTP/1.1 only, so same-host concurrency comes from parallel
+# pooled sockets rather than HTTP/2 streams; every fetcher here hits a distinct
+# host with a single request per cycle.
+HTTP_POOL_LIMIT_PER_HOST = 4
+
+# Bound every request (connect, per-read, and overall incl. retries) and retry
+# transient gateway errors and rate limiting with exponential backoff, or
+# after the wait the server asks for when it names one.
+HTTP_TIMEOUT = aiohttp.ClientTimeout(total=60, sock_connect=3.05, sock_read=10)
+HTTP_RETRY_ATTEMPTS = 3
+HTTP_RETRY_BACKOFF = 0.3  # seconds, doubled after every failed attempt
+HTTP_RETRY_STATUSES = frozenset({429, 502, 503, 504})
+HTTP_RETRY_AFTER_MAX = 10  # seconds; a longer requested wait isn't retried
+
 # ---------------------------------------------------------------------------
 # Fetchers (re-implemented with aiohttp)
 # ---------------------------------------------------------------------------
@@ -93,15 +103,14 @@ CYCLE_INTERVAL = 30 * 60  # 30 minutes in seconds
 async def fetch_polymarket_odds(session: aiohttp.ClientSession) -> dict | None:
     """Fetch Iran strike odds from Polymarket Gamma API."""
     try:
-        log.info("=" * 50)
-        log.info("POLYMARKET ODDS")
-        log.info("=" * 50)
+        log.info(LOG_SECTION, "POLYMARKET ODDS")
 
-        async with session.get("https://gamma-api.polymarket.com/public-search?q=iran") as resp:
-            if resp.status != 200:
-                log.warning("Polymarket API error: %d", resp.status)
-                return None
-            data = await resp.json(content_type=None)
+        # Search results rarely change between cycles; revalidate them
+        fetched = await _get_cached(session, "https://gamma-api.polymarket.com/public-search?q=iran")
+        if fetched is None:
+            log.warning("Polymarket API unavailable")
+            return None
+        data = orjson.loads(fetched[0])
 
         if isinstance(data, dict) and data.get("events"):
             events = data["events"]
@@ -113,116 +122,84 @@ async def fetch_polymarket_odds(session: aiohttp.ClientSession) -> dict | None:
             log.warning("Unexpected Polymarket response format: %s", type(data).__name__)
             return None
 
-        events = [e for e in events if isinstance(e, dict)]
+        now = datetime.now()
+        week_ahead = now + timedelta(days=7)
         highest_odds = 0
         market_title = ""
 
         log.info("Scanning %d events...", len(events))
 
-        def get_market_odds(market):
-            odds = 0
-            prices = market.get("outcomePrices", [])
-            if prices and len(prices) > 0:
-                try:
-                    yes_price = float(str(prices[0]) if prices[0] else "0")
-                    if yes_price > 1:
-                        odds = round(yes_price)
-                    elif 0 < yes_price <= 1:
-                        odds = round(yes_price * 100)
-                    if odds >= 100 and len(prices) > 1:
-                        no_price = float(str(prices[1])) if prices[1] else 0
-                        if 0 < no_price < 1:
-                            odds = round((1 - no_price) * 100)
-                        elif no_price > 1:
-                            odds = 100 - round(no_price)
-                except (ValueError, TypeError):
-                    pass
-            if odds == 0 or odds >= 100:
-                try:
-                    best_ask = float(market.get("bestAsk", 0) or 0)
-                    if best_ask > 1:
-                        odds = round(best_ask)
-                    elif 0 < best_ask <= 1:
-                        odds = round(best_ask * 100)
-                except (ValueError, TypeError):
-                    pass
-            if odds == 0 or odds >= 100:
-                try:
-                    last_price = float(market.get("lastTradePrice", 0) or 0)
-                    if last_price > 1:
-                        odds = round(last_price)
-                    elif 0 < last_price <= 1:
-                        odds = round(last_price * 100)
-                except (ValueError, TypeError):
-                    pass
-            if odds >= 100:
-                return 0
-            return odds
-
-        def is_near_term_market(title):
-            title_lower = title.lower()
-            now = datetime.now()
-            week_ahead = now + timedelta(days=7)
-            for i, month in enumerate(MONTHS, 1):
-                if month in title_lower:
-                    match = re.search(rf"{month}\s+(\d{{1,2}})", title_lower)
-                    if match:
-                        day = int(match.group(1))
-                        try:
-                            market_date = datetime(now.year, i, day)
-                            if market_date < now:
-                                market_date = datetime(now.year + 1, i, day)
-                            if now <= market_date <= week_ahead:
-                                log.info("    Market date %s is within 7 days", market_date.strftime("%Y-%m-%d"))
-                                return True
-                        except ValueError:
-                            pass
-            return False
-
-        # First pass: specific strike markets
+        # Single pass over the events. Strike markets set highest_odds; while
+        # none has odds yet, any non-negated, near-term Iran market is tracked
+        # on the side as the fallback
+        fallback_odds = 0
+        fallback_title = ""
+        # Malformed entries are skipped where they're met rather than
+        # filtered into a second list first
         for event in events:
-            event_title = (event.get("title") or "").lower()
-            if "will us or israel strike iran" in event_title or "us strikes iran by" in event_title:
-                if not is_near_term_market(event.get("title", "")):
-                    continue
-                for market in event.get("markets", []):
-                    odds = get_market_odds(market)
-                    if odds > highest_odds:
-                        highest_odds = odds
-                        market_title = market.get("question") or event.get("title") or ""
-            for market in event.get("markets", []):
-                market_question = (market.get("question") or "").lower()
-                if any(neg in market_question for neg in NEGATIVE_KEYWORDS):
+            if highest_odds >= MAX_MARKET_ODDS:
+                break
+            if not isinstance(event, dict):
+                continue
+            title = event.get("title") or ""
+            event_title = title.lower()
+            markets = event.get("markets") or ()
+            is_strike_event = (
+                "will us or israel strike iran" in event_title
+                or "us strikes iran by" in event_title
+            )
+            is_fallback_event = (
+                highest_odds == 0
+                and "iran" in event_title
+                and not NEGATIVE_RE.search(event_title)
+            )
+            # Both paths gate on the event's date; check it once
+            event_near_term = (is_strike_event or is_fallback_event) and is_near_term_market(
+                event_title, now, week_ahead
+            )
+            scan_strikes = True
+            if is_strike_event:
+                if event_near_term:
+                    for market in markets:
+                        if not isinstance(market, dict):
+                            continue
+                        odds = market_odds(market)
+                        if odds > highest_odds:
+                            highest_odds = odds
+                            market_title = market.get("question") or title
+                            if highest_odds >= MAX_MARKET_ODDS:
+                                break
+                else:
+                    scan_strikes = False
+            scan_fallback = is_fallback_event and highest_odds == 0 and event_near_term
+            if not (scan_strikes or scan_fallback):
+                continue
+            for market in markets:
+                # Nothing left in this event (or any other) can beat it
+                if highest_odds >= MAX_MARKET_ODDS:
+                    break
+                if not isinstance(market, dict):
                     continue
-                if "iran" in market_question and any(kw in market_question for kw in STRIKE_KEYWORDS):
-                    market_name = market.get("question") or ""
-                    if not is_near_term_market(market_name):
-                        continue
-                    odds = get_market_odds(market)
-                    if odds > 0 and odds > highest_odds:
-                        highest_odds = odds
-                        market_title = market_name
-
-        # Second pass: any Iran-related market
-        if highest_odds == 0:
-            for event in events:
-                event_title = (event.get("title") or "").lower()
-                if any(neg in event_title for neg in NEGATIVE_KEYWORDS):
+                question = market.get("question") or ""
+                market_question = question.lower()
+                if NEGATIVE_RE.search(market_question):
                     continue
-                if "iran" in event_title:
-                    if not is_near_term_market(event.get("title", "")):
-                        continue
-                    for market in event.get("markets", []):
-                        market_question = (market.get("question") or "").lower()
-                        if any(neg in market_question for neg in NEGATIVE_KEYWORDS):
-                            continue
-                        market_name = market.get("question") or event.get("title") or ""
-                        if not is_near_term_market(market_name):
-                            continue
-                        odds = get_market_odds(market)
+                if scan_strikes and "iran" in market_question and STRIKE_RE.search(market_question):
+                    if is_near_term_market(market_question, now, week_ahead):
+                        odds = market_odds(market)
                         if odds > 0 and odds > highest_odds:
                             highest_odds = odds
-                            market_title = market_name
+                            market_title = question
+                if scan_fallback and highest_odds == 0:
+                    market_name = question or title
+                    if is_near_term_market(market_question or event_title, now, week_ahead):
+                        odds = market_odds(market)
+                        if odds > fallback_odds:
+                            fallback_odds = odds
+                            fallback_title = market_name
+
+        if highest_odds == 0:
+            highest_odds, market_title = fallback_odds, fallback_title
 
         if highest_odds > 0:
             display = market_title[:70] + "..." if len(market_title) > 70 else market_title
@@ -232,7 +209,7 @@ async def fetch_polymarket_odds(session: aiohttp.ClientSession) -> dict | None:
         return {
             "odds": highest_odds,
             "market": market_title,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
         }
 
     except Exception as e:
@@ -241,75 +218,178 @@ async def fetch_polymarket_odds(session: aiohttp.ClientSession) -> dict | None:
         return None
 
 
-async def fetch_news_intel(session: aiohttp.ClientSession) -> dict | None:
-    """Fetch Iran-related news from RSS feeds."""
+# Once this many fetches in a row all read at least POLYMARKET_RESOLVED_ODDS,
+# the market has resolved and is only re-checked every POLYMARKET_SETTLED_TTL
+# seconds instead of every cycle. A 0% reading is not a resolution: it is
+# also what a run that found no qualifying market returns, and a new market
+# entering the 7-day window must be picked up on the next cycle.
+POLYMARKET_SETTLED_RUNS = 6
+POLYMARKET_SETTLED_TTL = 6 * 3600
+POLYMARKET_RESOLVED_ODDS = 95
+
+# Odds from the most recent fetches, and the last result with its fetch
+# time (time.monotonic())
+_polymarket_recent: deque[int] = deque(maxlen=POLYMARKET_SETTLED_RUNS)
+_polymarket_last: tuple[float, dict] | None = None
+
+
+async def fetch_polymarket_unless_settled(session: aiohttp.ClientSession) -> dict | None:
+    """Fetch Polymarket odds, or reuse the last result once the market has resolved."""
+    global _polymarket_last
+
+    if (
+        _polymarket_last is not None
+        and len(_polymarket_recent) == POLYMARKET_SETTLED_RUNS
+        and min(_polymarket_recent) >= POLYMARKET_RESOLVED_ODDS
+        and time.monotonic() - _polymarket_last[0] < POLYMARKET_SETTLED_TTL
+    ):
+        log.info(LOG_SECTION, "POLYMARKET ODDS")
+        log.info("Market resolved at %d%% for %d runs, reusing last result",
+                 _polymarket_last[1]["odds"], POLYMARKET_SETTLED_RUNS)
+        return _polymarket_last[1]
+
+    result = await fetch_polymarket_odds(session)
+    if result is not None:
+        _polymarket_recent.append(result["odds"])
+        _polymarket_last = (time.monotonic(), result)
+    return result
+
+
+# Validators, last body and when that body was last confirmed current, per
+# URL, kept across cycles so unchanged responses come back as a bodyless 304
+# instead of a full download, and a failed feed fetch can fall back to a
+# recent copy.
+_http_cache: dict[str, tuple[dict[str, str], bytes, datetime]] = {}
+
+# How old a previous copy may be and still stand in for a failed fetch
+STALE_MAX_AGE = timedelta(hours=6)
+
+
+def _stale_copy(
+    cached: tuple[dict[str, str], bytes, datetime] | None, allow_stale: bool
+) -> tuple[bytes, datetime] | None:
+    """Return the previous copy of a response if allowed and recent enough, else None."""
+    if cached is None or not allow_stale:
+        return None
+    age = datetime.now() - cached[2]
+    if age > STALE_MAX_AGE:
+        return None
+    log.info("    Using previous copy from %d min ago", age.total_seconds() // 60)
+    return cached[1], cached[2]
+
+
+async def _get_cached(
+    session: aiohttp.ClientSession, url: str, allow_stale: bool = False
+) -> tuple[bytes, datetime] | None:
+    """GET a URL's body, revalidating the previous copy with ETag/Last-Modified.
+
+    Returns the body and when it was last confirmed current. With
+    allow_stale, a failed request falls back to a copy from the last
+    STALE_MAX_AGE, still carrying its original fetch time, so one flaky
+    source doesn't drop out of the run.
+    """
+    cached = _http_cache.get(url)
+    headers = (cached[0] or None) if cached else None
+
     try:
-        log.info("=" * 50)
-        log.info("NEWS INTELLIGENCE")
-        log.info("=" * 50)
+        async with session.get(url, headers=headers) as resp:
+            if resp.status == 304 and cached:
+                log.info("    Not modified, reusing previous copy")
+                fetched_at = datetime.now()
+                _http_cache[url] = (cached[0], cached[1], fetched_at)
+                return cached[1], fetched_at
+            if resp.status != 200:
+                log.warning("    Failed: %d", resp.status)
+                return _stale_copy(cached, allow_stale)
+            # Keep the raw bytes: expat and orjson both decode them
+            # themselves, so there's no str decode just to be re-encoded
+            content = await resp.read()
+
+            validators = {}
+            if resp.headers.get("ETag"):
+                validators["If-None-Match"] = resp.headers["ETag"]
+            if resp.headers.get("Last-Modified"):
+                validators["If-Modified-Since"] = resp.headers["Last-Modified"]
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        log.warning("    Error: %s", e)
+        return _stale_copy(cached, allow_stale)
+
+    fetched_at = datetime.now()
+    _http_cache[url] = (validators, content, fetched_at)
+    return content, fetched_at
+
+
+async def _fetch_feed_articles(
+    session: aiohttp.ClientSession, feed_url: str
+) -> tuple[list[dict], datetime | None]:
+    """Fetch one feed and return its Iran-related articles and when the feed was fetched."""
+    articles = []
+    fetched_at = None
+    try:
+        log.info("  Fetching %s...", feed_url[:50])
+        fetched = await _get_cached(session, feed_url, allow_stale=True)
+        if fetched is None:
+            return articles, fetched_at
+        content, fetched_at = fetched
+
+        # One C-level scan over the whole body: a feed that never mentions
+        # Iran can't yield an article, so don't parse it at all
+        if not IRAN_BYTES_RE.search(content):
+            log.info("    No Iran mentions, skipping")
+            return articles, fetched_at
+
+        for item in iter_feed_items(content):
+            title_tag, desc_tag = FEED_ITEM_TAGS[item.tag]
+            # findtext gives "" for a missing or empty element alike
+            title = item.findtext(title_tag, "")
+            desc = item.findtext(desc_tag, "")
+
+            # Scan title and description in place; most items aren't
+            # about Iran and never need a combined, lowercased copy
+            if IRAN_RE.search(title) or IRAN_RE.search(desc):
+                articles.append({
+                    "title": title[:100],
+                    "is_alert": bool(ALERT_RE.search(title) or ALERT_RE.search(desc)),
+                })
+
+    except Exception as e:
+        log.warning("    Error: %s", e)
+    return articles, fetched_at
 
-        all_articles = []
-        alert_count = 0
 
-        for feed_url in RSS_FEEDS:
-            try:
-                log.info("  Fetching %s...", feed_url[:50])
-                headers = {"User-Agent": "Mozilla/5.0 (compatible; StrikeRadar/1.0)"}
-                async with session.get(feed_url, headers=headers) as resp:
-                    if resp.status != 200:
-                        log.warning("    Failed: %d", resp.status)
-                        continue
-                    content = await resp.text()
-
-                root = ET.fromstring(content)
-                items = root.findall(".//item")
-                if not items:
-                    items = root.findall(".//{http://www.w3.org/2005/Atom}entry")
-
-                for item in items:
-                    title_elem = item.find("title")
-                    desc_elem = item.find("description")
-                    if title_elem is None:
-                        title_elem = item.find("{http://www.w3.org/2005/Atom}title")
-                    if desc_elem is None:
-                        desc_elem = item.find("{http://www.w3.org/2005/Atom}summary")
-
-                    title = title_elem.text if title_elem is not None else ""
-                    desc = desc_elem.text if desc_elem is not None else ""
-                    combined = (title + " " + desc).lower()
-
-                    if any(kw in combined for kw in IRAN_KEYWORDS):
-                        is_alert = any(kw in combined for kw in ALERT_KEYWORDS)
-                        if is_alert:
-                            alert_count += 1
-                        all_articles.append({
-                            "title": title[:100] if title else "",
-                            "is_alert": is_alert,
-                        })
-
-            except Exception as e:
-                log.warning("    Error: %s", e)
-                continue
+async def fetch_news_intel(session: aiohttp.ClientSession) -> dict | None:
+    """Fetch Iran-related news from RSS feeds."""
+    try:
+        log.info(LOG_SECTION, "NEWS INTELLIGENCE")
 
-        # Deduplicate
-        seen: set[str] = set()
-        unique_articles = []
-        for article in all_articles:
-            key = article["title"][:40].lower()
-            if key not in seen:
-                seen.add(key)
-                unique_articles.append(article)
+        # Feeds are independent, so fetch them concurrently; gather keeps
+        # feed order, which the title dedup below relies on
+        results = await asyncio.gather(
+            *(_fetch_feed_articles(session, feed_url) for feed_url in RSS_FEEDS)
+        )
+        # Feeds cross-post the same story under slightly different titles;
+        # count each story once, alerts included
+        unique_articles = dedup_articles(
+            article for articles, _ in results for article in articles
+        )
+        # A feed that fell back to an earlier copy makes the whole reading
+        # only as recent as that copy
+        fetched_at = min(
+            (fetched_at for _, fetched_at in results if fetched_at is not None),
+            default=datetime.now(),
+        )
+        alert_count = sum(article["is_alert"] for article in unique_articles)
 
         log.info("Found %d articles (%d critical)", len(unique_articles), alert_count)
         alert_ratio = alert_count / len(unique_articles) if len(unique_articles) > 0 else 0
-        risk = max(3, round(pow(alert_ratio, 2) * 85))
+        risk = max(3, round(alert_ratio * alert_ratio * 85))
         log.info("Result: Risk %d%%", risk)
 
         return {
             "articles": unique_articles,
             "total_count": len(unique_articles),
             "alert_count": alert_count,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": fetched_at.isoformat(),
         }
 
     except Exception as e:
@@ -318,128 +398,37 @@ async def fetch_news_intel(session: aiohttp.ClientSession) -> dict | None:
         return None
 
 
-async def fetch_aviation_data(session: aiohttp.ClientSession) -> dict | None:
-    """Fetch OpenSky Network data for aircraft over Iran."""
-    try:
-        log.info("=" * 50)
-        log.info("AVIATION TRACKING")
-        log.info("=" * 50)
-
-        url = "https://opensky-network.org/api/states/all?lamin=25&lomin=44&lamax=40&lomax=64"
-        async with session.get(url) as resp:
-            if resp.status != 200:
-                log.warning("OpenSky API error: %d", resp.status)
-                return None
-            data = await resp.json(content_type=None)
-
-        civil_count = 0
-        airlines: list[str] = []
-
-        if data.get("states") and isinstance(data["states"], list):
-            for aircraft in data["states"]:
-                icao = aircraft[0]
-                callsign = (aircraft[1] or "").strip()
-                on_ground = aircraft[8]
-
-                if on_ground:
-                    continue
-
-                try:
-                    icao_num = int(icao, 16)
-                    if USAF_HEX_START <= icao_num <= USAF_HEX_END:
-                        continue
-                except Exception:
-                    pass
-
-                civil_count += 1
-                if callsign and len(callsign) >= 3:
-                    airline_code = callsign[:3]
-                    if airline_code not in airlines:
-                        airlines.append(airline_code)
-
-        log.info("Detected %d aircraft, %d airlines over Iran", civil_count, len(airlines))
-        risk = max(3, 95 - round(civil_count * 0.8))
-        log.info("Result: Risk %d%%", risk)
-
-        return {
-            "aircraft_count": civil_count,
-            "airline_count": len(airlines),
-            "airlines": airlines[:10],
-            "timestamp": datetime.now().isoformat(),
-        }
-    except Exception as e:
-        log.error("Aviation error: %s", e)
-        return None
-
-
-async def fetch_tanker_activity(session: aiohttp.ClientSession) -> dict | None:
-    """Fetch US military tanker activity in Middle East."""
+async def fetch_opensky_states(session: aiohttp.ClientSession) -> list | None:
+    """Fetch one OpenSky snapshot covering both the aviation and tanker areas."""
     try:
-        log.info("=" * 50)
-        log.info("TANKER ACTIVITY")
-        log.info("=" * 50)
-
-        url = "https://opensky-network.org/api/states/all?lamin=20&lomin=40&lamax=40&lomax=65"
-        async with session.get(url) as resp:
+        async with session.get(OPENSKY_STATES_URL) as resp:
             if resp.status != 200:
                 log.warning("OpenSky API error: %d", resp.status)
                 return None
-            data = await resp.json(content_type=None)
-
-        tanker_count = 0
-        tanker_callsigns: list[str] = []
-
-        if data.get("states") and isinstance(data["states"], list):
-            for aircraft in data["states"]:
-                icao = aircraft[0]
-                callsign = (aircraft[1] or "").strip().upper()
-
-                try:
-                    icao_num = int(icao, 16)
-                    is_us_military = USAF_HEX_START <= icao_num <= USAF_HEX_END
-                except Exception:
-                    is_us_military = False
-
-                is_tanker_callsign = any(callsign.startswith(prefix) for prefix in TANKER_PREFIXES)
-                has_kc_pattern = "KC" in callsign or "TANKER" in callsign
-
-                if is_us_military and (is_tanker_callsign or has_kc_pattern):
-                    tanker_count += 1
-                    if callsign:
-                        tanker_callsigns.append(callsign)
-
-        log.info("Detected %d tankers in Middle East", tanker_count)
-        if tanker_callsigns:
-            log.info("  Callsigns: %s", ", ".join(tanker_callsigns[:5]))
-        risk = round((tanker_count / 10) * 100)
-        log.info("Result: Risk %d%%", risk)
-
-        return {
-            "tanker_count": tanker_count,
-            "callsigns": tanker_callsigns[:5],
-            "timestamp": datetime.now().isoformat(),
-        }
+            # The snapshot runs to megabytes; hand orjson the raw UTF-8
+            # body rather than a decoded copy of it
+            data = orjson.loads(await resp.read())
+        states = data.get("states")
     except Exception as e:
-        log.error("Tanker error: %s", e)
+        log.error("OpenSky error: %s", e)
         return None
+    return states if isinstance(states, list) else []
 
 
 async def fetch_weather_data(session: aiohttp.ClientSession, api_key: str) -> dict | None:
     """Fetch weather conditions for Tehran."""
     try:
-        log.info("=" * 50)
-        log.info("WEATHER CONDITIONS")
-        log.info("=" * 50)
+        log.info(LOG_SECTION, "WEATHER CONDITIONS")
 
         url = (
             f"https://api.openweathermap.org/data/2.5/weather"
             f"?lat=35.6892&lon=51.389&appid={api_key}&units=metric"
         )
-        async with session.get(url) as resp:
-            if resp.status != 200:
-                log.warning("Weather API error: %d", resp.status)
-                return None
-            data = await resp.json(content_type=None)
+        fetched = await _get_cached(session, url)
+        if fetched is None:
+            log.warning("Weather API unavailable")
+            return None
+        data = orjson.loads(fetched[0])
 
         if not data.get("main"):
             log.warning("Weather: No main data in response")
@@ -485,9 +474,7 @@ async def fetch_cloudflare_connectivity(session: aiohttp.ClientSession, api_toke
     - Blackout (<= -90%): 25% risk contribution
     """
     try:
-        log.info("=" * 50)
-        log.info("DIGITAL CONNECTIVITY")
-        log.info("=" * 50)
+        log.info(LOG_SECTION, "DIGITAL CONNECTIVITY")
 
         if not api_token:
             log.warning("Cloudflare Radar API token not configured")
@@ -520,7 +507,7 @@ async def fetch_cloudflare_connectivity(session: aiohttp.ClientSession, api_toke
                     "error": f"API returned {resp.status}",
                 }
 
-            data = await resp.json(content_type=None)
+            data = orjson.loads(await resp.read())
 
         # Extract timeseries values from the response
         result = data.get("result", {})
@@ -594,101 +581,14 @@ async def fetch_cloudflare_connectivity(session: aiohttp.ClientSession, api_toke
         return None
 
 
-def fetch_pentagon_data() -> dict:
-    """Compute Pentagon Pizza Meter data (no API call, time-based simulation)."""
-    log.info("=" * 50)
-    log.info("PENTAGON PIZZA METER")
-    log.info("=" * 50)
-
-    now = datetime.now()
-    current_hour = now.hour
-    current_day = now.weekday()
-
-    busyness_data = []
-
-    for place in PIZZA_PLACES:
-        base_score = 30
-        status = "normal"
-
-        if 11 <= current_hour <= 14 and current_day < 5:
-            base_score = 50
-        elif 17 <= current_hour <= 20:
-            base_score = 55
-        elif current_hour >= 22 or current_hour < 6:
-            day_hash = int(hashlib.md5(f"{now.date()}".encode()).hexdigest()[:8], 16)
-            if day_hash % 10 < 2:
-                base_score = 70
-                status = "elevated_late"
-            else:
-                base_score = 20
-        elif current_day >= 5:
-            base_score = 25
-
-        busyness_data.append({
-            "name": place["name"],
-            "status": status,
-            "score": base_score,
-        })
-        log.info("  %s: Status=%s, Score=%d", place["name"], status, base_score)
-
-    is_late_night = current_hour >= 22 or current_hour < 6
-    is_weekend = current_day >= 5
-
-    log.info("  Hour: %d, Late night: %s, Weekend: %s", current_hour, is_late_night, is_weekend)
-
-    total_score = 0
-    valid_readings = 0
-
-    for place in busyness_data:
-        if place.get("score") is not None:
-            score = place["score"]
-            valid_readings += 1
-            if is_late_night and score > 60:
-                weighted = score * 1.5
-                log.info("    %s: %d x 1.5 (late night busy) = %.1f", place["name"], score, weighted)
-                total_score += weighted
-            elif is_weekend and score > 70:
-                weighted = score * 1.3
-                log.info("    %s: %d x 1.3 (weekend busy) = %.1f", place["name"], score, weighted)
-                total_score += weighted
-            else:
-                log.info("    %s: %d (normal weighting)", place["name"], score)
-                total_score += score
-
-    if valid_readings == 0:
-        log.info("  No valid readings, using default score of 30")
-        activity_score = 30
-    else:
-        avg_score = total_score / valid_readings
-        activity_score = round(min(100, max(0, avg_score)))
-        log.info("  Total: %.1f, Readings: %d, Average: %.1f", total_score, valid_readings, avg_score)
-
-    if activity_score >= 80:
-        risk_contribution = 10
-        pentagon_status = "High Activity"
-    elif activity_score >= 60:
-        risk_contribution = 7
-        pentagon_status = "Elevated"
-    elif activity_score >= 40:
-        risk_contribution = 3
-        pentagon_status = "Normal"
-    else:
-        risk_contribution = 1
-        pentagon_status = "Low Activity"
-
-    display_risk = round((risk_contribution / 10) * 100)
-    log.info("Activity: %s - Score: %d/100", pentagon_status, activity_score)
-    log.info("Result: Risk %d%%", display_risk)
-
-    return {
-        "score": activity_score,
-        "risk_contribution": risk_contribution,
-        "status": pentagon_status,
-        "places": busyness_data,
-        "timestamp": now.isoformat(),
-        "is_late_night": is_late_night,
-        "is_weekend": is_weekend,
-    }
+async def fetch_opensky_data(
+    session: aiohttp.ClientSession,
+) -> tuple[dict | None, dict | None]:
+    """Fetch one OpenSky snapshot and derive the aviation and tanker readings."""
+    states = await fetch_opensky_states(session)
+    if states is None:
+        return None, None
+    return aviation_from_states(states), tankers_from_states(states)
 
 
 # ---------------------------------------------------------------------------
@@ -705,15 +605,13 @@ def calculate_risk_scores(
     pentagon_data: dict,
 ) -> dict:
     """Calculate all risk scores and return the signal data dict."""
-    log.info("=" * 50)
-    log.info("RISK CALCULATION")
-    log.info("=" * 50)
+    log.info(LOG_SECTION, "RISK CALCULATION")
 
     # NEWS (20% weight)
     articles = news_intel.get("total_count", 0)
     alert_count = news_intel.get("alert_count", 0)
     alert_ratio = alert_count / articles if articles > 0 else 0
-    news_display_risk = max(3, round(pow(alert_ratio, 2) * 85))
+    news_display_risk = max(3, round(alert_ratio * alert_ratio * 85))
     news_detail = f"{articles} articles, {alert_count} critical"
     log.info("  News:       %d%% (%s)", news_display_risk, news_detail)
 
@@ -827,32 +725,31 @@ def calculate_risk_scores(
     }
 
 
-def update_history(current_data: dict, scores: dict, raw: dict) -> dict:
+def update_history(
+    current_data: dict, scores: dict, raw: dict, now: datetime | None = None
+) -> dict:
     """Update signal histories and total risk history, return the final JSON structure."""
     # Extract existing histories
     if "total_risk" in current_data and "history" in current_data.get("total_risk", {}):
         history = current_data["total_risk"]["history"]
         signal_history = {
             sig: current_data.get(sig, {}).get("history", [])
-            for sig in ["news", "connectivity", "flight", "tanker", "pentagon", "polymarket", "weather"]
+            for sig in SIGNALS
         }
     else:
         history = current_data.get("history", [])
-        signal_history = current_data.get("signalHistory", {
-            "news": [], "connectivity": [], "flight": [], "tanker": [],
-            "pentagon": [], "polymarket": [], "weather": [],
-        })
+        signal_history = current_data.get("signalHistory", {})
 
     # Append current scores to signal histories
-    for sig in ["news", "connectivity", "flight", "tanker", "pentagon", "polymarket", "weather"]:
-        if sig not in signal_history:
-            signal_history[sig] = []
-        signal_history[sig].append(scores[sig]["risk"])
-        if len(signal_history[sig]) > 20:
-            signal_history[sig] = signal_history[sig][-20:]
+    # (trimmed in place, so a full history doesn't get copied every run)
+    for sig in SIGNALS:
+        values = signal_history.setdefault(sig, [])
+        values.append(scores[sig]["risk"])
+        del values[:-SIGNAL_HISTORY_LENGTH]
 
     # Total risk history management
-    now = datetime.now()
+    if now is None:
+        now = datetime.now()
     current_timestamp = int(now.timestamp() * 1000)
     total_risk = scores["total_risk"]
 
@@ -869,9 +766,9 @@ def update_history(current_data: dict, scores: dict, raw: dict) -> dict:
 
         if crossed_boundary:
             log.info("  History: crossed 12h boundary, pinning + adding new point")
-            if len(history) > 0:
-                history = history[1:]
-            if len(history) > 0:
+            # Drop the oldest point in place rather than copying the rest
+            del history[0]
+            if history:
                 history[-1] = {
                     "timestamp": current_boundary_ts,
                     "risk": last_point.get("risk", total_risk),
@@ -939,6 +836,57 @@ def update_history(current_data: dict, scores: dict, raw: dict) -> dict:
     }
 
 
+# ---------------------------------------------------------------------------
+# data.json storage
+# ---------------------------------------------------------------------------
+
+# The last payload this process wrote, keyed by the file's mtime. Unless a
+# git pull replaced the file since, the next cycle reuses it instead of
+# reading and parsing its own output back from disk. The dict is handed
+# over, not copied, so it is dropped from here once read: the caller edits
+# it in place, and a failed write must not leave those edits behind.
+_data_mirror: tuple[int, dict] | None = None
+
+
+def read_data_file() -> dict:
+    """Return the current data.json contents, or {} if missing/unreadable."""
+    global _data_mirror
+
+    try:
+        mtime = DATA_JSON_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    if _data_mirror is not None and _data_mirror[0] == mtime:
+        log.info("data.json unchanged since last write, reusing in-memory copy")
+        data = _data_mirror[1]
+        _data_mirror = None
+        return data
+
+    try:
+        return orjson.loads(DATA_JSON_PATH.read_bytes())
+    except (orjson.JSONDecodeError, OSError) as e:
+        log.warning("Could not read existing data.json: %s", e)
+        return {}
+
+
+def write_data_file(data: dict) -> None:
+    """Write data.json and remember it for the next cycle's read."""
+    global _data_mirror
+
+    payload = orjson.dumps(data, option=orjson.OPT_INDENT_2) + b"\n"
+    DATA_JSON_PATH.parent.mkdir(parents=True, exist_ok=True)
+    # Write a sibling file and rename it over data.json, so git and any
+    # other reader only ever see the old or the new file, never half of it
+    tmp_path = DATA_JSON_PATH.with_name(DATA_JSON_PATH.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, DATA_JSON_PATH)
+    _data_mirror = (DATA_JSON_PATH.stat().st_mtime_ns, data)
+    log.info("Wrote %s", DATA_JSON_PATH)
+
+
 # ---------------------------------------------------------------------------
 # Git operations
 # ---------------------------------------------------------------------------
@@ -995,43 +943,83 @@ def git_commit_and_push() -> None:
 # Main pipeline
 # ---------------------------------------------------------------------------
 
-async def run_pipeline(weather_api_key: str, cloudflare_token: str) -> None:
-    """Execute one full data-fetch-and-update cycle."""
-    log.info("=" * 60)
-    log.info("STARTING PIPELINE CYCLE")
-    log.info("=" * 60)
+def _retry_after(resp: aiohttp.ClientResponse) -> float | None:
+    """Seconds the server asked to wait before retrying, if it said."""
+    # OpenSky names its own header; HTTP-date Retry-After values are ignored
+    value = resp.headers.get("Retry-After") or resp.headers.get("X-Rate-Limit-Retry-After-Seconds")
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
 
-    # 1. Pull latest
-    git_pull()
 
-    # 2. Read existing data
-    current_data: dict = {}
-    if DATA_JSON_PATH.exists():
+async def _retry_middleware(
+    req: aiohttp.ClientRequest, handler: aiohttp.ClientHandlerType
+) -> aiohttp.ClientResponse:
+    """Retry connection failures, 429 and 502/503/504 responses with backoff."""
+    for attempt in range(1, HTTP_RETRY_ATTEMPTS):
+        retry_after = None
         try:
-            current_data = json.loads(DATA_JSON_PATH.read_text())
-        except (json.JSONDecodeError, OSError) as e:
-            log.warning("Could not read existing data.json: %s", e)
-
-    # 3. Fetch APIs
-    async with aiohttp.ClientSession() as session:
-        # Fetch polymarket, news, aviation, weather, connectivity in parallel
-        polymarket_task = asyncio.create_task(fetch_polymarket_odds(session))
-        news_task = asyncio.create_task(fetch_news_intel(session))
-        aviation_task = asyncio.create_task(fetch_aviation_data(session))
-        weather_task = asyncio.create_task(fetch_weather_data(session, weather_api_key))
-        connectivity_task = asyncio.create_task(fetch_cloudflare_connectivity(session, cloudflare_token))
-
-        polymarket_result, news_result, aviation_result, weather_result, connectivity_result = await asyncio.gather(
-            polymarket_task, news_task, aviation_task, weather_task, connectivity_task,
-        )
+            resp = await handler(req)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            reason = type(e).__name__
+        else:
+            if resp.status not in HTTP_RETRY_STATUSES:
+                return resp
+            retry_after = _retry_after(resp)
+            if retry_after is not None and retry_after > HTTP_RETRY_AFTER_MAX:
+                # Not worth holding up the cycle; the caller's fallback applies
+                return resp
+            resp.release()
+            reason = str(resp.status)
+
+        delay = HTTP_RETRY_BACKOFF * 2 ** (attempt - 1) if retry_after is None else retry_after
+        log.info("  %s: %s, retrying in %.1fs...", req.url.host, reason, delay)
+        await asyncio.sleep(delay)
+
+    return await handler(req)
+
+
+def create_session() -> aiohttp.ClientSession:
+    """Create the shared HTTP session used by every fetcher across cycles."""
+    connector = aiohttp.TCPConnector(limit_per_host=HTTP_POOL_LIMIT_PER_HOST)
+    return aiohttp.ClientSession(
+        connector=connector,
+        headers=HTTP_HEADERS,
+        timeout=HTTP_TIMEOUT,
+        middlewares=(_retry_middleware,),
+    )
+
+
+async def run_pipeline(
+    session: aiohttp.ClientSession, weather_api_key: str, cloudflare_token: str
+) -> None:
+    """Execute one full data-fetch-and-update cycle."""
+    log.info(LOG_SECTION, "STARTING PIPELINE CYCLE")
+
+    # 1. Pull latest in a worker thread; the APIs don't depend on it, so the
+    #    git round trip overlaps with the fetches instead of preceding them
+    pull_task = asyncio.create_task(asyncio.to_thread(git_pull))
+
+    # 2. Fetch everything in parallel; one OpenSky snapshot feeds both the
+    #    aviation and tanker readings
+    polymarket_task = asyncio.create_task(fetch_polymarket_unless_settled(session))
+    news_task = asyncio.create_task(fetch_news_intel(session))
+    opensky_task = asyncio.create_task(fetch_opensky_data(session))
+    weather_task = asyncio.create_task(fetch_weather_data(session, weather_api_key))
+    connectivity_task = asyncio.create_task(fetch_cloudflare_connectivity(session, cloudflare_token))
+
+    polymarket_result, news_result, (aviation_result, tanker_result), weather_result, connectivity_result = (
+        await asyncio.gather(polymarket_task, news_task, opensky_task, weather_task, connectivity_task)
+    )
 
-        # 4. Sleep 2s then fetch tanker (OpenSky rate limit)
-        log.info("Waiting 2s before tanker fetch (OpenSky rate limit)...")
-        await asyncio.sleep(2)
-        tanker_result = await fetch_tanker_activity(session)
+    # 3. Read existing data once the pull has landed
+    await pull_task
+    current_data = read_data_file()
 
-    # 5. Pentagon (no API call)
-    pentagon_result = fetch_pentagon_data()
+    # 4. Pentagon (no API call); one clock reading serves the rest of the cycle
+    now = datetime.now()
+    pentagon_result = fetch_pentagon_data(now)
 
     # Use fallback data from previous cycle where fetches failed
     news_data = news_result or current_data.get("news", {}).get("raw_data", {})
@@ -1041,7 +1029,7 @@ async def run_pipeline(weather_api_key: str, cloudflare_token: str) -> None:
     weather_data = weather_result or current_data.get("weather", {}).get("raw_data", {})
     polymarket_data = polymarket_result or current_data.get("polymarket", {}).get("raw_data", {})
 
-    # 6. Calculate risk scores
+    # 5. Calculate risk scores
     scores = calculate_risk_scores(
         news_intel=news_data,
         connectivity=connectivity_data,
@@ -1052,7 +1040,7 @@ async def run_pipeline(weather_api_key: str, cloudflare_token: str) -> None:
         pentagon_data=pentagon_result,
     )
 
-    # 7. Update history and build final structure
+    # 6. Update history and build final structure
     final_data = update_history(current_data, scores, raw={
         "news": news_data,
         "connectivity": connectivity_data,
@@ -1061,15 +1049,14 @@ async def run_pipeline(weather_api_key: str, cloudflare_token: str) -> None:
         "weather": weather_data,
         "polymarket": polymarket_data,
         "pentagon": pentagon_result,
-    })
+    }, now=now)
 
-    # 8. Write data.json
-    DATA_JSON_PATH.parent.mkdir(parents=True, exist_ok=True)
-    DATA_JSON_PATH.write_text(json.dumps(final_data, indent=2) + "\n")
-    log.info("Wrote %s", DATA_JSON_PATH)
+    # 7. Write data.json
+    write_data_file(final_data)
 
-    # 9. Commit and push
-    git_commit_and_push()
+    # 8. Commit and push; like the pull, the git subprocesses run off the
+    #    event loop
+    await asyncio.to_thread(git_commit_and_push)
 
     log.info("Pipeline cycle complete.")
 
@@ -1078,7 +1065,29 @@ async def run_pipeline(weather_api_key: str, cloudflare_token: str) -> None:
 # Entry point
 # ---------------------------------------------------------------------------
 
+def _acquire_instance_lock():
+    """Take an exclusive lock on INSTANCE_LOCK_PATH, or return None if another copy holds it.
+
+    The lock lives as long as the returned file stays open, i.e. for the
+    life of the process, and the OS drops it if the process dies.
+    """
+    INSTANCE_LOCK_PATH.parent.mkdir(parents=True, exist_ok=True)
+    lock_file = open(INSTANCE_LOCK_PATH, "ab")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
 def main() -> None:
+    # Two copies would interleave data.json writes and git commits/pushes
+    instance_lock = _acquire_instance_lock()
+    if instance_lock is None:
+        log.error("Another update_data.py is already running, exiting.")
+        sys.exit(1)
+
     weather_api_key = os.environ.get("OPENWEATHER_API_KEY", "")
     cloudflare_token = os.environ.get("CLOUDFLARE_RADAR_TOKEN", "")
     if not weather_api_key:
@@ -1097,17 +1106,18 @@ def main() -> None:
     signal.signal(signal.SIGTERM, _handle_signal)
 
     async def _loop():
-        while not shutdown_event.is_set():
-            try:
-                await run_pipeline(weather_api_key, cloudflare_token)
-            except Exception:
-                log.error("Unhandled error in pipeline cycle:\n%s", traceback.format_exc())
+        async with create_session() as session:
+            while not shutdown_event.is_set():
+                try:
+                    await run_pipeline(session, weather_api_key, cloudflare_token)
+                except Exception:
+                    log.error("Unhandled error in pipeline cycle:\n%s", traceback.format_exc())
 
-            log.info("Sleeping %d minutes until next cycle...", CYCLE_INTERVAL // 60)
-            try:
-                await asyncio.wait_for(shutdown_event.wait(), timeout=CYCLE_INTERVAL)
-            except asyncio.TimeoutError:
-                pass  # Normal — timeout means it's time for the next cycle
+                log.info("Sleeping %d minutes until next cycle...", CYCLE_INTERVAL // 60)
+                try:
+                    await asyncio.wait_for(shutdown_event.wait(), timeout=CYCLE_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass  # Normal — timeout means it's time for the next cycle
 
         log.info("Shutdown complete.")
 
@@ -0,0 +1,204 @@
+"""Shared constants for the Aegis data worker."""
+
+import re
+from typing import NamedTuple
+
+R2_KEY = "data.json"
+
+# How long a warm isolate may reuse the data.json body it last served,
+# in seconds; matches the max-age browsers are already told to cache for
+SERVED_DATA_TTL = 60
+
+# Upper bound on any single outbound fetch from the scheduled run. Workers'
+# fetch has no timeout of its own, so a stalled host would otherwise hold
+# the whole gather until the invocation is killed.
+FETCH_TIMEOUT_MS = 20_000
+
+# Section banner emitted as one log record instead of three separate lines
+LOG_SECTION = "=" * 50 + "\n%s\n" + "=" * 50
+
+
+class PizzaPlace(NamedTuple):
+    name: str
+    place_id: str
+    address: str
+
+
+PIZZA_PLACES = (
+    PizzaPlace(
+        name="Domino's Pizza",
+        place_id="ChIJN1t_tDeuEmsRUsoyG83frY4",
+        address="Pentagon City",
+    ),
+    PizzaPlace(
+        name="Papa John's",
+        place_id="ChIJP3Sa8ziYEmsRUKgyFmh9AQM",
+        address="Near Pentagon",
+    ),
+    PizzaPlace(
+        name="Pizza Hut",
+        place_id="ChIJrTLr-GyuEmsRBfy61i59si0",
+        address="Pentagon Area",
+    ),
+)
+
+ALERT_KEYWORDS = (
+    "strike",
+    "attack",
+    "military",
+    "bomb",
+    "missile",
+    "war",
+    "imminent",
+    "troops",
+    "forces",
+)
+
+IRAN_KEYWORDS = ("iran", "tehran", "persian gulf", "strait of hormuz")
+
+STRIKE_KEYWORDS = ("strike", "attack", "bomb", "military action")
+
+NEGATIVE_KEYWORDS = (" not ", "won't", "will not", "doesn't", "does not")
+
+# Single-pass scanners for the keyword lists above. STRIKE/NEGATIVE run on
+# already-lowercased text; IRAN/ALERT scan raw feed text case-insensitively.
+# Matching stays substring-based like the original `kw in text` checks, so
+# "iranian" and "warship" still count; don't add \b without re-tuning.
+# Each scan is a single C-level pass without an Aho-Corasick dependency. Only
+# the case-sensitive STRIKE/NEGATIVE scanners also let the re engine skip
+# ahead on the keywords' first letters; the IGNORECASE ones try every offset.
+STRIKE_RE = re.compile("|".join(map(re.escape, STRIKE_KEYWORDS)))
+NEGATIVE_RE = re.compile("|".join(map(re.escape, NEGATIVE_KEYWORDS)))
+IRAN_RE = re.compile("|".join(map(re.escape, IRAN_KEYWORDS)), re.IGNORECASE)
+ALERT_RE = re.compile("|".join(map(re.escape, ALERT_KEYWORDS)), re.IGNORECASE)
+# IRAN_RE for raw feed bytes (UTF-8 or another ASCII-compatible encoding)
+IRAN_BYTES_RE = re.compile(IRAN_RE.pattern.encode(), re.IGNORECASE)
+
+# market_odds() discards readings of 100+, so 99 can't be beaten
+MAX_MARKET_ODDS = 99
+
+# Pizza-meter base score by [weekday][hour]: weekday lunch, every evening,
+# weekend, otherwise normal. None marks late night (22:00-05:59), whose score
+# depends on that night's simulated spike.
+PENTAGON_BASE_SCORES = tuple(
+    tuple(
+        50 if 11 <= hour <= 14 and day < 5
+        else 55 if 17 <= hour <= 20
+        else None if hour >= 22 or hour < 6
+        else 25 if day >= 5
+        else 30
+        for hour in range(24)
+    )
+    for day in range(7)
+)
+
+# Pentagon activity score floors and the (risk contribution, status) each
+# band maps to; bisect_right over the floors picks the band
+PENTAGON_THRESHOLDS = (40, 60, 80)
+PENTAGON_LEVELS = (
+    (1, "Low Activity"),
+    (3, "Normal"),
+    (7, "Elevated"),
+    (10, "High Activity"),
+)
+
+# A tuple so callsign.startswith() can test every prefix in one C call
+TANKER_PREFIXES = (
+    # Original fuel/gas station themed
+    "IRON",
+    "SHELL",
+    "TEXAN",
+    "ETHYL",
+    "PEARL",
+    "ARCO",
+    "ESSO",
+    "MOBIL",
+    "GULF",
+    "TOPAZ",
+    "PACK",
+    "DOOM",
+    "TREK",
+    "REACH",
+    # Additional fuel-themed callsigns
+    "EXXON",
+    "TEXACO",
+    "OILER",
+    "OPEC",
+    "PETRO",
+    # KC-10 unit callsigns
+    "TOGA",
+    "DUCE",
+    "FORCE",
+    "GUCCI",
+    "XTNDR",
+    "SPUR",
+    "TEAM",
+    "QUID",
+    # KC-135 unit callsigns
+    "BOLT",
+    "BROKE",
+    "BROOM",
+    "BOBBY",
+    "BOBBIE",
+    "BODE",
+    "CONIC",
+    "MAINE",
+    "BRIG",
+    "ARTLY",
+    "BANKER",
+    "BRUSH",
+    # KC-46 unit callsigns
+    "ARRIS",
+    # Coronet/trans-Atlantic mission callsigns
+    "GOLD",
+    "BLUE",
+    "CLEAN",
+    "VINYL",
+)
+
+# One OpenSky snapshot of the wider Middle East serves both readings: tankers
+# use all of it, the civil aviation count keeps only Iran's airspace
+OPENSKY_STATES_URL = "https://opensky-network.org/api/states/all?lamin=20&lomin=40&lamax=40&lomax=65"
+IRAN_AIRSPACE = (25, 44, 40, 64)  # lamin, lomin, lamax, lomax
+
+USAF_HEX_START = int("AE0000", 16)
+USAF_HEX_END = int("AE7FFF", 16)
+
+RSS_FEEDS = (
+    "https://feeds.bbci.co.uk/news/world/middle_east/rss.xml",
+    "https://www.aljazeera.com/xml/rss/all.xml",
+)
+
+# Feeds are handed to the XML parser in slices of this many characters so
+# finished <item>/<entry> elements can be released before the rest is parsed
+FEED_PARSE_CHUNK = 64 * 1024
+
+# News dedup: titles whose 3-word shingle sets are more than this similar
+# (Jaccard) are the same story; each title is bucketed under this many of
+# its smallest shingle hashes to find candidates
+DUPLICATE_TITLE_SIMILARITY = 0.6
+TITLE_SHINGLE_KEYS = 8
+TITLE_WORD_RE = re.compile(r"\w+")
+# Tags feeds append to a headline ("... - live", "... | BBC News"); they are
+# cut before shingling so a cross-post differing only by one still matches
+FEED_TITLE_SUFFIX_RE = re.compile(
+    r"\s*[-\u2013\u2014|:]\s*(?:live(?: updates)?|bbc(?: news)?|al jazeera)\s*$",
+    re.IGNORECASE,
+)
+
+MONTHS = (
+    "january", "february", "march", "april", "may", "june",
+    "july", "august", "september", "october", "november", "december",
+)
+
+# "<month> <day>" as it appears in lowercased market titles
+MONTH_DAY_RE = re.compile(r"(%s)\s+(\d{1,2})" % "|".join(MONTHS))
+MONTH_NUMBERS = {month: i for i, month in enumerate(MONTHS, 1)}
+
+# Signals scored each run, and how many past readings each keeps
+SIGNALS = ("news", "connectivity", "flight", "tanker", "pentagon", "polymarket", "weather")
+SIGNAL_HISTORY_LENGTH = 20
+
+# Cloudflare Radar API configuration
+CLOUDFLARE_RADAR_BASE_URL = "https://api.cloudflare.com/client/v4/radar"
+CLOUDFLARE_RADAR_LOCATION = "IR"  # Iran
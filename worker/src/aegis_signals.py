@@ -0,0 +1,364 @@
+"""Source-independent signal logic shared by update_data.py and the Worker.
+
+Everything here works on already-downloaded data, so the aiohttp pipeline
+and the Pyodide fetchers run the same parsing and scoring code.
+"""
+
+import heapq
+import logging
+import xml.etree.ElementTree as ET
+from bisect import bisect_right
+from datetime import datetime
+
+from aegis_constants import (
+    DUPLICATE_TITLE_SIMILARITY,
+    FEED_PARSE_CHUNK,
+    FEED_TITLE_SUFFIX_RE,
+    IRAN_AIRSPACE,
+    LOG_SECTION,
+    MONTH_DAY_RE,
+    MONTH_NUMBERS,
+    PENTAGON_BASE_SCORES,
+    PENTAGON_LEVELS,
+    PENTAGON_THRESHOLDS,
+    PIZZA_PLACES,
+    TANKER_PREFIXES,
+    TITLE_SHINGLE_KEYS,
+    TITLE_WORD_RE,
+    USAF_HEX_END,
+    USAF_HEX_START,
+)
+
+log = logging.getLogger("aegis.signals")
+
+
+def _price_to_odds(value) -> int:
+    """Read a price quoted as a 0-1 probability or a percentage as whole percent."""
+    try:
+        price = float(value or 0)
+    except (ValueError, TypeError):
+        return 0
+    if price > 1:
+        return round(price)
+    if price > 0:
+        return round(price * 100)
+    return 0
+
+
+def market_odds(market: dict) -> int:
+    """Read a market's YES probability as a 0-99 percentage (0 if unusable)."""
+    odds = 0
+    prices = market.get("outcomePrices")
+    if prices:
+        odds = _price_to_odds(prices[0])
+        # A YES price at 100% is usually stale; derive it from NO instead
+        if odds >= 100 and len(prices) > 1:
+            try:
+                no_price = float(prices[1] or 0)
+            except (ValueError, TypeError):
+                no_price = 0
+            if 0 < no_price < 1:
+                odds = round((1 - no_price) * 100)
+            elif no_price > 1:
+                odds = 100 - round(no_price)
+    # Fall back to the order book, then the last trade, only when needed
+    for key in ("bestAsk", "lastTradePrice"):
+        if odds != 0 and odds < 100:
+            break
+        odds = _price_to_odds(market.get(key))
+    if odds >= 100:
+        return 0
+    return odds
+
+
+def is_near_term_market(title: str, now: datetime, week_ahead: datetime) -> bool:
+    """Whether a "<Month> <day>" date in the lowercased title falls between now and week_ahead."""
+    # Only the first date given for each month counts
+    seen = set()
+    for match in MONTH_DAY_RE.finditer(title):
+        month = match.group(1)
+        if month in seen:
+            continue
+        seen.add(month)
+        i = MONTH_NUMBERS[month]
+        day = int(match.group(2))
+        try:
+            market_date = datetime(now.year, i, day)
+            if market_date < now:
+                market_date = datetime(now.year + 1, i, day)
+            if now <= market_date <= week_ahead:
+                log.info(
+                    "    Market date %s is within 7 days",
+                    market_date.strftime("%Y-%m-%d"),
+                )
+                return True
+            else:
+                log.debug(
+                    "    Market date %s is too far away (>7 days)",
+                    market_date.strftime("%Y-%m-%d"),
+                )
+        except ValueError:
+            pass
+    return False
+
+
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+# Item tag -> (title tag, description tag); an item's format is known from
+# its own tag, so each field takes one lookup instead of a find-and-fallback
+FEED_ITEM_TAGS = {
+    "item": ("title", "description"),
+    ATOM_NS + "entry": (ATOM_NS + "title", ATOM_NS + "summary"),
+}
+
+
+def iter_feed_items(content: str | bytes):
+    """Yield each RSS <item> / Atom <entry> as soon as it is parsed, then free it."""
+    parser = ET.XMLPullParser(events=("end",))
+    for start in range(0, len(content), FEED_PARSE_CHUNK):
+        parser.feed(content[start:start + FEED_PARSE_CHUNK])
+        for _, elem in parser.read_events():
+            if elem.tag in FEED_ITEM_TAGS:
+                yield elem
+                elem.clear()
+    parser.close()
+
+
+def _title_shingles(title: str) -> frozenset[int]:
+    """Hashes of the title's 3-word shingles (the whole title if shorter), feed tag removed."""
+    words = TITLE_WORD_RE.findall(FEED_TITLE_SUFFIX_RE.sub("", title).lower())
+    if len(words) < 3:
+        return frozenset((hash(tuple(words)),))
+    return frozenset(hash(tuple(words[i:i + 3])) for i in range(len(words) - 2))
+
+
+def dedup_articles(articles) -> list[dict]:
+    """Drop articles whose title is a near-duplicate of an earlier one.
+
+    Titles are near-duplicates when their shingle sets have a Jaccard
+    similarity above DUPLICATE_TITLE_SIMILARITY. Each kept title is filed
+    under its few smallest shingle hashes (MinHash-style), so a new title is
+    only compared against the kept ones it shares a bucket with.
+    """
+    unique = []
+    kept_shingles: list[frozenset[int]] = []
+    buckets: dict[int, list[int]] = {}
+    for article in articles:
+        shingles = _title_shingles(article["title"])
+        keys = heapq.nsmallest(TITLE_SHINGLE_KEYS, shingles)
+        candidates = {i for key in keys for i in buckets.get(key, ())}
+        if any(
+            len(shingles & kept_shingles[i]) / len(shingles | kept_shingles[i])
+            > DUPLICATE_TITLE_SIMILARITY
+            for i in candidates
+        ):
+            continue
+        for key in keys:
+            buckets.setdefault(key, []).append(len(kept_shingles))
+        kept_shingles.append(shingles)
+        unique.append(article)
+    return unique
+
+
+def aviation_from_states(states: list) -> dict | None:
+    """Count civil aircraft over Iran in an OpenSky states snapshot."""
+    try:
+        log.info(LOG_SECTION, "AVIATION TRACKING")
+
+        civil_count = 0
+        # Insertion-ordered set of airline codes
+        airlines: dict[str, None] = {}
+
+        lamin, lomin, lamax, lomax = IRAN_AIRSPACE
+
+        # Cheapest rejections first: most rows are on the ground or outside
+        # Iran's box, and never need their ICAO or callsign looked at
+        for aircraft in states:
+            if aircraft[8]:  # on_ground
+                continue
+            # The snapshot covers the wider tanker area; keep Iran's airspace
+            lon, lat = aircraft[5], aircraft[6]
+            if lat is None or lon is None or not (lamin <= lat <= lamax and lomin <= lon <= lomax):
+                continue
+
+            try:
+                icao_num = int(aircraft[0], 16)
+                if USAF_HEX_START <= icao_num <= USAF_HEX_END:
+                    continue
+            except Exception:
+                pass
+
+            civil_count += 1
+            callsign = (aircraft[1] or "").strip()
+            if len(callsign) >= 3:
+                airline_code = callsign[:3]
+                airlines[airline_code] = None
+
+        log.info("Detected %d aircraft, %d airlines over Iran", civil_count, len(airlines))
+        risk = max(3, 95 - round(civil_count * 0.8))
+        log.info("Result: Risk %d%%", risk)
+
+        return {
+            "aircraft_count": civil_count,
+            "airline_count": len(airlines),
+            "airlines": list(airlines)[:10],
+            "timestamp": datetime.now().isoformat(),
+        }
+    except Exception as e:
+        log.error("Aviation error: %s", e)
+        return None
+
+
+def tankers_from_states(states: list) -> dict | None:
+    """Find US military tankers in the Middle East in an OpenSky states snapshot."""
+    try:
+        log.info(LOG_SECTION, "TANKER ACTIVITY")
+
+        tanker_count = 0
+        tanker_callsigns: list[str] = []
+
+        for aircraft in states:
+            callsign = (aircraft[1] or "").strip().upper()
+
+            # The callsign tests are cheap and reject nearly every row, so
+            # only the few candidates left pay for parsing the ICAO hex
+            is_tanker_callsign = callsign.startswith(TANKER_PREFIXES)
+            has_kc_pattern = "KC" in callsign or "TANKER" in callsign
+            if not (is_tanker_callsign or has_kc_pattern):
+                continue
+
+            try:
+                icao_num = int(aircraft[0], 16)
+            except Exception:
+                continue
+
+            if USAF_HEX_START <= icao_num <= USAF_HEX_END:
+                tanker_count += 1
+                # Only the first five distinct callsigns are reported, so
+                # the membership test never scans more than five entries
+                if len(tanker_callsigns) < 5 and callsign not in tanker_callsigns:
+                    tanker_callsigns.append(callsign)
+
+        log.info("Detected %d tankers in Middle East", tanker_count)
+        if tanker_callsigns:
+            log.info("  Callsigns: %s", ", ".join(tanker_callsigns))
+        risk = round((tanker_count / 10) * 100)
+        log.info("Result: Risk %d%%", risk)
+
+        return {
+            "tanker_count": tanker_count,
+            "callsigns": tanker_callsigns,
+            "timestamp": datetime.now().isoformat(),
+        }
+    except Exception as e:
+        log.error("Tanker error: %s", e)
+        return None
+
+
+def _day_hash(day: int) -> int:
+    """Stable per-day value that decides whether tonight simulates a spike.
+
+    Mixes the date's ordinal with the MurmurHash3 32-bit finalizer: a few
+    integer ops that scatter consecutive days evenly, no crypto hash needed.
+    """
+    h = day
+    h ^= h >> 16
+    h = (h * 0x85EBCA6B) & 0xFFFFFFFF
+    h ^= h >> 13
+    h = (h * 0xC2B2AE35) & 0xFFFFFFFF
+    h ^= h >> 16
+    return h
+
+
+def fetch_pentagon_data(now: datetime | None = None) -> dict:
+    """Compute Pentagon Pizza Meter data (no API call, time-based simulation)."""
+    log.info(LOG_SECTION, "PENTAGON PIZZA METER")
+
+    if now is None:
+        now = datetime.now()
+    current_hour = now.hour
+    current_day = now.weekday()
+    is_late_night = current_hour >= 22 or current_hour < 6
+    is_weekend = current_day >= 5
+
+    # The simulation depends only on the time, not the place, so classify
+    # once and report the same reading for every place
+    base_score = PENTAGON_BASE_SCORES[current_day][current_hour]
+    status = "normal"
+
+    if base_score is None:  # late night: tonight may be a simulated spike
+        day_hash = _day_hash(now.toordinal())
+        if day_hash % 10 < 2:
+            base_score = 70
+            status = "elevated_late"
+        else:
+            base_score = 20
+
+    busyness_data = []
+    for place in PIZZA_PLACES:
+        busyness_data.append({
+            "name": place.name,
+            "status": status,
+            "score": base_score,
+        })
+        log.info("  %s: Status=%s, Score=%d", place.name, status, base_score)
+
+    # Calculate activity score
+    log.info("  Hour: %d, Late night: %s, Weekend: %s", current_hour, is_late_night, is_weekend)
+
+    # The time flags are the same for every reading, so pick the single
+    # busy-place boost that can apply once instead of re-testing per place
+    if is_late_night:
+        boost_above, boost, boost_reason = 60, 1.5, "late night busy"
+    elif is_weekend:
+        boost_above, boost, boost_reason = 70, 1.3, "weekend busy"
+    else:
+        boost_above, boost, boost_reason = None, 1, ""
+
+    readings = [
+        (place["name"], place["score"])
+        for place in busyness_data
+        if place.get("score") is not None
+    ]
+    valid_readings = len(readings)
+
+    if boost_above is None:
+        # Nothing can be boosted, so the average is a plain mean
+        total_score = sum(score for _, score in readings)
+        log.info("    %d readings (normal weighting)", valid_readings)
+    else:
+        total_score = 0
+        for name, score in readings:
+            if score > boost_above:
+                weighted = score * boost
+                log.info("    %s: %d x %s (%s) = %.1f", name, score, boost, boost_reason, weighted)
+                total_score += weighted
+            else:
+                log.info("    %s: %d (normal weighting)", name, score)
+                total_score += score
+
+    if valid_readings == 0:
+        log.info("  No valid readings, using default score of 30")
+        activity_score = 30
+    else:
+        avg_score = total_score / valid_readings
+        activity_score = round(min(100, max(0, avg_score)))
+        log.info("  Total: %.1f, Readings: %d, Average: %.1f", total_score, valid_readings, avg_score)
+
+    # Determine risk contribution (max 10)
+    risk_contribution, pentagon_status = PENTAGON_LEVELS[
+        bisect_right(PENTAGON_THRESHOLDS, activity_score)
+    ]
+
+    display_risk = round((risk_contribution / 10) * 100)
+    log.info("Activity: %s - Score: %d/100", pentagon_status, activity_score)
+    log.info("Result: Risk %d%%", display_risk)
+
+    return {
+        "score": activity_score,
+        "risk_contribution": risk_contribution,
+        "status": pentagon_status,
+        "places": busyness_data,
+        "timestamp": now.isoformat(),
+        "is_late_night": is_late_night,
+        "is_weekend": is_weekend,
+    }
@@ -11,17 +11,18 @@ which is the stable Python Workers API.
 import asyncio
 import json
 import logging
+import time
+from datetime import datetime
 
 from js import Response, Headers, Object
 
-from constants import R2_KEY
+from aegis_constants import LOG_SECTION, R2_KEY, SERVED_DATA_TTL
+from aegis_signals import fetch_pentagon_data
 from fetchers import (
-    fetch_aviation_data,
     fetch_cloudflare_connectivity,
     fetch_news_intel,
-    fetch_pentagon_data,
+    fetch_opensky_data,
     fetch_polymarket_odds,
-    fetch_tanker_activity,
     fetch_weather_data,
 )
 from risk import calculate_risk_scores, update_history
@@ -45,10 +46,10 @@ def _make_response(body, status=200, headers_dict=None):
     return Response.new(body, init)
 
 
-ALLOWED_ORIGINS = [
+ALLOWED_ORIGINS = frozenset({
     "https://usstrikeradar.com",
     "http://localhost",
-]
+})
 
 
 def _get_cors_origin(request):
@@ -62,12 +63,35 @@ def _get_cors_origin(request):
     return "https://usstrikeradar.com"
 
 
+# Last data.json body served by this isolate, as (time.monotonic(), body)
+_served_body: tuple[float, str] | None = None
+
+
+def _data_json_response(body, cors_origin):
+    """Build the 200 response for a data.json body."""
+    return _make_response(
+        body,
+        headers_dict={
+            "Content-Type": "application/json",
+            "Cache-Control": "public, max-age=60, s-maxage=300",
+            "Access-Control-Allow-Origin": cors_origin,
+        },
+    )
+
+
 async def on_fetch(request, env):
     """Serve data.json from R2 with cache headers."""
+    global _served_body
     log.info("on_fetch: serving data.json from R2")
 
     cors_origin = _get_cors_origin(request)
 
+    # A warm isolate reuses the body it served moments ago instead of
+    # re-reading and re-encoding the object from R2 on every request
+    if _served_body is not None and time.monotonic() - _served_body[0] < SERVED_DATA_TTL:
+        log.info("Returning cached data.json")
+        return _data_json_response(_served_body[1], cors_origin)
+
     try:
         obj = await env.DATA_BUCKET.get(R2_KEY)
     except Exception as e:
@@ -97,7 +121,8 @@ async def on_fetch(request, env):
         text = await obj.text()
         data = json.loads(text)
 
-        # Add mock connectivity data if missing (until scheduled task runs)
+        # Add mock connectivity data if missing (until scheduled task runs);
+        # otherwise the stored text is served as-is, with no re-encode
         if "connectivity" not in data:
             data["connectivity"] = {
                 "risk": 0,
@@ -105,66 +130,70 @@ async def on_fetch(request, env):
                 "history": [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
                 "raw_data": {"status": "STABLE", "trend": 0.0}
             }
-
-        response_body = json.dumps(data)
+            response_body = json.dumps(data)
+        else:
+            response_body = text
     except Exception as e:
         log.warning("Failed to parse data, returning raw: %s", e)
         response_body = text if 'text' in dir() else "{}"
 
+    _served_body = (time.monotonic(), response_body)
     log.info("Returning data.json")
-    return _make_response(
-        response_body,
-        headers_dict={
-            "Content-Type": "application/json",
-            "Cache-Control": "public, max-age=60, s-maxage=300",
-            "Access-Control-Allow-Origin": cors_origin,
-        },
-    )
+    return _data_json_response(response_body, cors_origin)
+
+
+async def _read_current_data(env) -> dict:
+    """Load the previous data.json from R2 (preserves history), or {} if absent."""
+    obj = await env.DATA_BUCKET.get(R2_KEY)
+    if obj is None:
+        log.info("No existing data in R2, starting fresh")
+        return {}
+    text = await obj.text()
+    log.info("Loaded existing data from R2 (%d bytes)", len(text))
+    return json.loads(text)
 
 
 async def on_scheduled(controller, env, ctx):
     """Run the full data pipeline: fetch APIs, calculate risks, write to R2."""
-    log.info("=" * 50)
-    log.info("SCHEDULED RUN STARTING")
-    log.info("=" * 50)
+    global _served_body
+    log.info(LOG_SECTION, "SCHEDULED RUN STARTING")
 
-    # 1. Read existing data from R2 (preserve history)
-    current_data = {}
-    try:
-        obj = await env.DATA_BUCKET.get(R2_KEY)
-        if obj is not None:
-            text = await obj.text()
-            current_data = json.loads(text)
-            log.info("Loaded existing data from R2 (%d bytes)", len(text))
-        else:
-            log.info("No existing data in R2, starting fresh")
-    except Exception as e:
-        log.warning("Failed to read existing data from R2: %s", e)
-        current_data = {}
-
-    # 2. Compute Pentagon data (no API call)
-    pentagon_data = fetch_pentagon_data()
+    # 1. Compute Pentagon data (no API call); one clock reading serves the run
+    now = datetime.now()
+    pentagon_data = fetch_pentagon_data(now)
 
-    # 3. Fetch 5 independent APIs in parallel
+    # 2. Read existing data from R2 alongside the independent APIs; none of
+    #    the fetches depend on it, so the R2 round trip overlaps with them.
+    #    One OpenSky snapshot feeds both the aviation and tanker readings.
     api_key = getattr(env, "OPENWEATHER_API_KEY", "")
     cloudflare_token = getattr(env, "CLOUDFLARE_RADAR_TOKEN", "")
 
-    polymarket_result, news_result, aviation_result, weather_result, connectivity_result = (
-        await asyncio.gather(
-            fetch_polymarket_odds(),
-            fetch_news_intel(),
-            fetch_aviation_data(),
-            fetch_weather_data(api_key),
-            fetch_cloudflare_connectivity(cloudflare_token),
-            return_exceptions=True,
-        )
+    (
+        current_data,
+        polymarket_result,
+        news_result,
+        opensky_result,
+        weather_result,
+        connectivity_result,
+    ) = await asyncio.gather(
+        _read_current_data(env),
+        fetch_polymarket_odds(),
+        fetch_news_intel(),
+        fetch_opensky_data(),
+        fetch_weather_data(api_key),
+        fetch_cloudflare_connectivity(cloudflare_token),
+        return_exceptions=True,
     )
 
+    if isinstance(current_data, Exception):
+        log.warning("Failed to read existing data from R2: %s", current_data)
+        current_data = {}
+
     # Convert exceptions to None and log them
     for name, result in [
         ("Polymarket", polymarket_result),
         ("News", news_result),
-        ("Aviation", aviation_result),
+        ("OpenSky", opensky_result),
         ("Weather", weather_result),
         ("Connectivity", connectivity_result),
     ]:
@@ -175,18 +204,14 @@ async def on_scheduled(controller, env, ctx):
         polymarket_result = None
     if isinstance(news_result, Exception):
         news_result = None
-    if isinstance(aviation_result, Exception):
-        aviation_result = None
+    if isinstance(opensky_result, Exception):
+        opensky_result = (None, None)
+    aviation_result, tanker_result = opensky_result
     if isinstance(weather_result, Exception):
         weather_result = None
     if isinstance(connectivity_result, Exception):
         connectivity_result = None
 
-    # 4. Sleep for OpenSky rate limit, then fetch tanker data
-    log.info("Waiting 2s for OpenSky rate limit...")
-    await asyncio.sleep(2)
-    tanker_result = await fetch_tanker_activity()
-
     # Use previous data as fallback for any failed fetches
     polymarket_data = polymarket_result or current_data.get("polymarket", {}).get("raw_data", {})
     news_data = news_result or current_data.get("news", {}).get("raw_data", {})
@@ -211,7 +236,7 @@ async def on_scheduled(controller, env, ctx):
     if fallback_used:
         log.warning("Using previous data as fallback for: %s", ", ".join(fallback_used))
 
-    # 5. Calculate all risk scores
+    # 3. Calculate all risk scores
     scores = calculate_risk_scores(
         news_intel=news_data,
         connectivity=connectivity_data,
@@ -222,7 +247,7 @@ async def on_scheduled(controller, env, ctx):
         pentagon_data=pentagon_data,
     )
 
-    # 6. Update history and build final JSON
+    # 4. Update history and build final JSON
     raw = {
         "news": news_data,
         "connectivity": connectivity_data,
@@ -232,14 +257,14 @@ async def on_scheduled(controller, env, ctx):
         "polymarket": polymarket_data,
         "pentagon": pentagon_data,
     }
-    final_data = update_history(current_data, scores, raw)
+    final_data = update_history(current_data, scores, raw, now=now)
 
-    # 7. Write to R2
-    payload = json.dumps(final_data, indent=2)
+    # 5. Write to R2. Compact: indent= would force json's pure-Python
+    #    encoder, and nothing reads this object except on_fetch
+    payload = json.dumps(final_data, separators=(",", ":"))
     await env.DATA_BUCKET.put(R2_KEY, payload)
+    _served_body = None
 
-    log.info("=" * 50)
-    log.info("DATA COLLECTION COMPLETE")
-    log.info("=" * 50)
+    log.info(LOG_SECTION, "DATA COLLECTION COMPLETE")
     log.info("Total Risk: %d%%", scores["total_risk"])
     log.info("Written %d bytes to R2", len(payload))
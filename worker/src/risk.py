@@ -3,6 +3,8 @@
 import logging
 from datetime import datetime
 
+from aegis_constants import LOG_SECTION, SIGNAL_HISTORY_LENGTH, SIGNALS
+
 log = logging.getLogger("aegis.risk")
 
 
@@ -21,15 +23,13 @@ def calculate_risk_scores(
     Returns a dict with per-signal risk/detail and total_risk.
     """
 
-    log.info("=" * 50)
-    log.info("RISK CALCULATION")
-    log.info("=" * 50)
+    log.info(LOG_SECTION, "RISK CALCULATION")
 
     # NEWS (20% weight)
     articles = news_intel.get("total_count", 0)
     alert_count = news_intel.get("alert_count", 0)
     alert_ratio = alert_count / articles if articles > 0 else 0
-    news_display_risk = max(3, round(pow(alert_ratio, 2) * 85))
+    news_display_risk = max(3, round(alert_ratio * alert_ratio * 85))
     news_detail = f"{articles} articles, {alert_count} critical"
     log.info("  News:       %d%% (%s)", news_display_risk, news_detail)
 
@@ -145,13 +145,16 @@ def calculate_risk_scores(
     }
 
 
-def update_history(current_data: dict, scores: dict, raw: dict) -> dict:
+def update_history(
+    current_data: dict, scores: dict, raw: dict, now: datetime | None = None
+) -> dict:
     """Update signal histories and total risk history, return the final JSON structure.
 
     Args:
         current_data: Existing data from R2 (for preserving history).
         scores: Output from calculate_risk_scores().
         raw: Dict of raw API results keyed by signal name.
+        now: Timestamp for this run (defaults to the current time).
     """
 
     # Extract existing histories
@@ -159,25 +162,22 @@ def update_history(current_data: dict, scores: dict, raw: dict) -> dict:
         history = current_data["total_risk"]["history"]
         signal_history = {
             sig: current_data.get(sig, {}).get("history", [])
-            for sig in ["news", "connectivity", "flight", "tanker", "pentagon", "polymarket", "weather"]
+            for sig in SIGNALS
         }
     else:
         history = current_data.get("history", [])
-        signal_history = current_data.get("signalHistory", {
-            "news": [], "connectivity": [], "flight": [], "tanker": [],
-            "pentagon": [], "polymarket": [], "weather": [],
-        })
+        signal_history = current_data.get("signalHistory", {})
 
     # Append current scores to signal histories
-    for sig in ["news", "connectivity", "flight", "tanker", "pentagon", "polymarket", "weather"]:
-        if sig not in signal_history:
-            signal_history[sig] = []
-        signal_history[sig].append(scores[sig]["risk"])
-        if len(signal_history[sig]) > 20:
-            signal_history[sig] = signal_history[sig][-20:]
+    # (trimmed in place, so a full history doesn't get copied every run)
+    for sig in SIGNALS:
+        values = signal_history.setdefault(sig, [])
+        values.append(scores[sig]["risk"])
+        del values[:-SIGNAL_HISTORY_LENGTH]
 
     # Total risk history management
-    now = datetime.now()
+    if now is None:
+        now = datetime.now()
     current_timestamp = int(now.timestamp() * 1000)
     total_risk = scores["total_risk"]
 
@@ -194,9 +194,9 @@ def update_history(current_data: dict, scores: dict, raw: dict) -> dict:
 
         if crossed_boundary:
             log.info("  History: crossed 12h boundary, pinning + adding new point")
-            if len(history) > 0:
-                history = history[1:]
-            if len(history) > 0:
+            # Drop the oldest point in place rather than copying the rest
+            del history[0]
+            if history:
                 history[-1] = {
                     "timestamp": current_boundary_ts,
                     "risk": last_point.get("risk", total_risk),